@@ -68,6 +68,7 @@ echo Common options:
 echo   -y N            Number of years to analyze ^(default: 10^)
 echo   -o DIR          Output directory for CSV ^(default: tool root directory^)
 echo   -i PATTERN      Ignore relative path patterns ^(glob; can repeat or comma-separate^)
+echo   -j N            Number of worker threads ^(default: min^(32, 2 x CPU count^)^)
 echo   --project-type  Project types to include: .bproj, .csproj, .dtproj, .scopeproj, .sqlproj, .vcproj, .vcxproj, .xproj, .sln ^(repeat or comma-separated^)
 echo   --write-while-analyze  Write CSV incrementally while analyzing ^(default: aggregate then write once^)
 echo   --quiet ^| --verbose  Quiet or verbose mode ^(mutually exclusive; place last^)
@@ -31,6 +31,7 @@ Common options:
   -y N            Number of years to analyze (default: 10)
   -o DIR          Output directory for CSV (default: tool root directory)
   -i PATTERN      Ignore relative path patterns (glob; can repeat or comma-separate)
+  -j N            Number of worker threads (default: min(32, 2 x CPU count))
   --project-type  Project types to include: .bproj, .csproj, .dtproj, .scopeproj, .sqlproj, .vcproj, .vcxproj, .xproj, .sln (repeat or comma-separated)
   --write-while-analyze  Write CSV incrementally while analyzing (default: aggregate then write once)
   --quiet | --verbose  Quiet or verbose mode (mutually exclusive; place last)
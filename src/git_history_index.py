@@ -0,0 +1,137 @@
+import subprocess
+import sys
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from tools import GIT_COMMIT_GRAPH_CONFIG, GIT_LOG_OPTIONS, subprocess_stream
+
+
+class GitHistoryIndex:
+    """
+    Commit counts per year (keyed by int year) for a set of project directories, from one repo-wide git log.
+    Each commit counts once for every project directory containing one of its changed files.
+    """
+
+    # git log options of the walk; the commit hash groups the per-parent diffs of a merge (-m), the parent hashes
+    # tell how many of those diffs to expect. -z ends every path with NUL and never quotes it, whatever characters
+    # it contains. --root lists the files of the initial commit even with log.showRoot=false in the user's config
+    LOG_OPTIONS: List[str] = [*GIT_LOG_OPTIONS, "--root", "-z", "--name-only", "--pretty=format:%x00%H %ad %P", "--date=format:%Y"]
+    # Pins what -m lists to one diff per parent: log.diffMerges in the user's config (git 2.31+) would otherwise
+    # reduce it to a single diff per merge. As a -c setting rather than --diff-merges=separate, older git accepts it
+    GIT_CONFIG: List[str] = ["-c", "log.diffMerges=separate"]
+    # Read buffer for the streamed git log output (NUL-separated fields)
+    READ_BUFFER_SIZE: int = 1 << 20
+    # Longest pathspec list passed to git (Windows caps a whole command line at 32767 characters); beyond it
+    # the walk covers the whole tree and paths outside the project directories are dropped while parsing
+    MAX_PATHSPEC_CHARS: int = 30000
+
+    def __init__(self, root: str, proj_dirs: Set[str], include_merges: bool = False) -> None:
+        self.root: str = root
+        self.proj_dirs: Set[str] = proj_dirs
+        self.options: List[str] = self.log_options(include_merges)
+        self.year_counts: Dict[str, Counter] = {d: Counter() for d in proj_dirs}
+        # Owning project directories per directory of a changed path
+        self._owners: Dict[str, Tuple[str, ...]] = {}
+        # The same keyed by the raw git output bytes, so each directory is decoded only once
+        self._owners_raw: Dict[bytes, Tuple[str, ...]] = {}
+
+    @classmethod
+    def log_options(cls, include_merges: bool = False) -> List[str]:
+        """Return the git log options of the walk (also recorded in the history cache)."""
+        return [*cls.LOG_OPTIONS, "-m" if include_merges else "--no-merges"]
+
+    def owning_projects(self, dirname: str) -> Tuple[str, ...]:
+        """Return the project directories (relative, '.' for root) that contain `dirname`, memoized per directory."""
+        owners = self._owners.get(dirname)
+        if owners is None:
+            parent = None if dirname == "." else (dirname.rpartition("/")[0] or ".")
+            owners = self.owning_projects(parent) if parent else ()
+            if dirname in self.proj_dirs:
+                owners = owners + (dirname,)
+            self._owners[dirname] = owners
+        return owners
+
+    def _pathspec_args(self) -> List[str]:
+        """
+        Return the arguments limiting the walk to the outermost project directories (with --full-history, so no merge
+        is simplified away), or [] if the root is a project directory or the pathspecs exceed MAX_PATHSPEC_CHARS.
+        """
+        if "." in self.proj_dirs:
+            return []
+        # A directory is outermost if no other project directory contains it
+        pathspecs = sorted(":(literal)" + d for d in self.proj_dirs if len(self.owning_projects(d)) == 1)
+        if sum(len(p) + 1 for p in pathspecs) > self.MAX_PATHSPEC_CHARS:
+            return []
+        return ["--full-history", "--", *pathspecs]
+
+    def _iter_records(self, fields: Iterable[bytes]) -> Iterator[Tuple[bytes, int, int, Set[str]]]:
+        """
+        Parse the NUL-separated log output and yield (hash, year, number of parents, owning project directories) per record.
+        Records look like b"\\0<hash> <year> <parent>...\\n<path>\\0<path>\\0\\0"; a header follows an empty field.
+        """
+        owners_raw = self._owners_raw
+        header: Optional[List[bytes]] = None
+        owners: Set[str] = set()
+        at_header = False
+        for path in fields:
+            if not path:
+                at_header = True
+                continue
+            if at_header:
+                at_header = False
+                if header is not None:
+                    yield header[0], int(header[1]), len(header) - 2, owners
+                line, _, path = path.partition(b"\n")
+                header = line.split()
+                owners = set()
+                if not path:
+                    continue
+            dirname = path.rpartition(b"/")[0]
+            found = owners_raw.get(dirname)
+            if found is None:
+                found = self.owning_projects(dirname.decode("utf-8", errors="replace") or ".")
+                owners_raw[dirname] = found
+            owners.update(found)
+        if header is not None:
+            yield header[0], int(header[1]), len(header) - 2, owners
+
+    def walk(self, revisions: List[str]) -> bool:
+        """
+        Walk the history of `revisions` and add its commits to year_counts.
+        Uses: git -C <root> -c log.diffMerges=separate log <LOG_OPTIONS> --no-merges <revisions> [--full-history -- <dirs>]
+        (`-m` instead of `--no-merges` with include_merges: a merge counts for directories changed against every parent.)
+        On failure, prints a warning and returns False (year_counts may then be incomplete).
+        """
+        year_counts = self.year_counts
+        commit, year, parents, listed = b"", 0, 0, 0
+        touched: Set[str] = set()
+        fields = subprocess_stream(
+            ["git", "-C", self.root, *GIT_COMMIT_GRAPH_CONFIG, *self.GIT_CONFIG, "log", *self.options, *revisions, *self._pathspec_args()],
+            bufsize=self.READ_BUFFER_SIZE,
+            sep=b"\x00",
+        )
+        try:
+            for sha, commit_year, commit_parents, owners in self._iter_records(fields):
+                if sha == commit:
+                    # Another parent of the same merge (-m)
+                    touched &= owners
+                    listed += 1
+                    continue
+                # git omits the diff against a parent it is identical to (within the limited paths), and such a
+                # merge changed nothing relative to that parent
+                if listed >= parents:
+                    for d in touched:
+                        year_counts[d][year] += 1
+                commit, year, parents, listed, touched = sha, commit_year, commit_parents, 1, owners
+            if listed >= parents:
+                for d in touched:
+                    year_counts[d][year] += 1
+
+        except subprocess.CalledProcessError as exc:
+            print(f"Warning: git log failed for '{self.root}': {exc.stderr.decode('utf-8', errors='replace').strip()}", file=sys.stderr)
+            return False
+        except (subprocess.SubprocessError, OSError, ValueError, IndexError) as exc:
+            print(f"Warning: git log exception for '{self.root}': {exc}", file=sys.stderr)
+            return False
+
+        return True
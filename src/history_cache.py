@@ -0,0 +1,86 @@
+import json
+import os
+import re
+import sys
+import tempfile
+import zlib
+from collections import Counter
+from typing import Dict, List
+
+
+def default_cache_dir() -> str:
+    """Return the per-user cache directory (XDG_CACHE_HOME, LOCALAPPDATA on Windows, else ~/.cache)."""
+    base = os.environ.get("XDG_CACHE_HOME") or (os.environ.get("LOCALAPPDATA") if os.name == "nt" else "")
+    if not base:
+        base = os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "project-modification-history")
+
+
+class HistoryCache:
+    """
+    On-disk cache of the repo-wide walk: all-time commit counts per year for each project directory, valid at
+    one HEAD commit, so a later run only walks `<cached head>..HEAD`.
+    """
+
+    # Bumped when counts written by an earlier version must not be reused
+    VERSION: int = 2
+
+    def __init__(self, root: str, options: List[str], cache_dir: str = "") -> None:
+        self.root: str = root
+        # The git log options the counts were produced with; a cache written with other options is not reused
+        self.options: List[str] = options
+        repo_name = re.sub(r"[^A-Za-z0-9._-]", "-", os.path.basename(os.path.normpath(root))) or "repo"
+        # Repos with the same folder name in different places get different files, and so do walks with different
+        # options (e.g. with and without --include-merges), so switching between them keeps both caches
+        root_key = f"{zlib.crc32(os.path.normcase(os.path.abspath(root)).encode('utf-8')):08x}"
+        options_key = f"{zlib.crc32(chr(0).join(options).encode('utf-8')):08x}"
+        self.path: str = os.path.join(cache_dir or default_cache_dir(), f"{repo_name}-{root_key}-{options_key}.json")
+        self.head: str = ""
+        self.year_counts: Dict[str, Counter] = {}
+
+    def load(self) -> bool:
+        """Read the cache file. Returns False (leaving the cache empty) if it is missing, unreadable or stale."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError) as exc:
+            print(f"Warning: ignoring unreadable history cache '{self.path}': {exc}", file=sys.stderr)
+            return False
+
+        if not isinstance(data, dict) or data.get("version") != self.VERSION or data.get("options") != self.options:
+            return False
+        try:
+            self.head = str(data["head"])
+            self.year_counts = {
+                rel_dir: Counter({int(year): int(count) for year, count in counts.items()})
+                for rel_dir, counts in data["dirs"].items()
+            }
+        except (KeyError, TypeError, ValueError, AttributeError):
+            self.head, self.year_counts = "", {}
+            return False
+        return True
+
+    def save(self, head: str, year_counts: Dict[str, Counter]) -> None:
+        """Atomically replace the cache file (temp file + rename). On failure, prints a warning."""
+        data = {
+            "version": self.VERSION,
+            "options": self.options,
+            "head": head,
+            "dirs": {rel_dir: {str(year): count for year, count in counts.items()} for rel_dir, counts in year_counts.items()},
+        }
+        tmp_path = ""
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                "w", encoding="utf-8", dir=os.path.dirname(self.path), suffix=".tmp", delete=False
+            ) as f:
+                tmp_path = f.name
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp_path, self.path)
+            self.head, self.year_counts = head, year_counts
+        except (OSError, TypeError, ValueError) as exc:
+            print(f"Warning: could not write history cache '{self.path}': {exc}", file=sys.stderr)
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
@@ -8,6 +8,9 @@ from project import Project
 from project_modification_analyzer import ProjectModificationAnalyzer
 from tools import nprint
 
+# Resolved once per run; the year window and the git --since bound are derived from it
+CURRENT_YEAR = datetime.now().year
+
 
 def _validate_root_directory(path: str) -> str:
     if not os.path.isdir(path):
@@ -27,6 +30,21 @@ def _validate_year_range(value: str) -> int:
         raise argparse.ArgumentTypeError("Year range must be an integer greater than or equal to 1.") from exc
 
 
+def _validate_jobs(value: str) -> int:
+    try:
+        ivalue = int(value)
+        if ivalue < 1:
+            raise argparse.ArgumentTypeError("Jobs must be an integer greater than or equal to 1.")
+        return ivalue
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError("Jobs must be an integer greater than or equal to 1.") from exc
+
+
+def _default_jobs() -> int:
+    # git log calls are mostly waiting on git/disk, so oversubscribe the cores a little
+    return min(32, (os.cpu_count() or 1) * 2)
+
+
 def _validate_output_directory(path: str) -> str:
     if os.path.isfile(path):
         raise argparse.ArgumentTypeError(
@@ -77,6 +95,56 @@ def parse_arguments():
             "Can be specified multiple times or comma-separated, e.g. 'src/Legacy,tests/*'"
         ),
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=_validate_jobs,
+        default=_default_jobs(),
+        help=(
+            "Number of worker threads for scanning the tree and, with --per-directory, "
+            "for the per-directory git log calls (default: min(32, 2 x CPU count))"
+        ),
+    )
+    parser.add_argument(
+        "--per-directory",
+        action="store_true",
+        help="Run one scoped git log per project directory instead of a single repo-wide git log",
+    )
+    parser.add_argument(
+        "--full-history",
+        action="store_true",
+        help=(
+            "Requires --per-directory: list the complete history in each git log and derive Total from it "
+            "(default: bound git log to the year window and count Total with git rev-list --count)"
+        ),
+    )
+    parser.add_argument(
+        "--include-merges",
+        action="store_true",
+        help=(
+            "Count merge commits that changed a project directory against all of their parents "
+            "(default: merge commits are skipped)"
+        ),
+    )
+    parser.add_argument(
+        "--no-cache",
+        dest="use_cache",
+        action="store_false",
+        help="Do not read or update the on-disk history cache used by the repo-wide git log",
+    )
+    parser.add_argument(
+        "--write-commit-graph",
+        dest="write_commit_graph",
+        action="store_true",
+        default=True,
+        help="Refresh the repo's commit-graph with changed-path Bloom filters before analyzing (default)",
+    )
+    parser.add_argument(
+        "--no-write-commit-graph",
+        dest="write_commit_graph",
+        action="store_false",
+        help="Do not write the commit-graph; use whatever the repo already has",
+    )
     parser.add_argument(
         "--write-while-analyze",
         action="store_true",
@@ -94,7 +162,11 @@ def parse_arguments():
         action="store_true",
         help="Enable verbose logs (additional details during processing)",
     )
-    return parser.parse_args()
+    args = parser.parse_args()
+    # The repo-wide walk always covers the complete history; the flag only changes the per-directory commands
+    if args.full_history and not args.per_directory:
+        parser.error("--full-history requires --per-directory")
+    return args
 
 
 def _flatten_types(values: List[str]) -> List[str]:
@@ -118,7 +190,7 @@ def _normalize_types(types: List[str]) -> List[str]:
 
 
 def _validate_types(types: List[str]) -> Tuple[List[str], List[str]]:
-    invalid = sorted(set(types) - set(Project.SUPPORTED_TYPES))
+    invalid = sorted(set(types) - Project.SUPPORTED_TYPES_SET)
     valid = sorted(set(types) - set(invalid))
     return valid, invalid
 
@@ -140,8 +212,7 @@ def select_project_types(raw_values: List[str]) -> Tuple[str, ...]:
 
 def get_year_window(year_range: int) -> List[str]:
     """Return a list of year strings for the last N natural years (current year first)."""
-    current_year = datetime.now().year
-    return [str(current_year - i) for i in range(year_range)]
+    return [str(CURRENT_YEAR - i) for i in range(year_range)]
 
 
 def flatten_ignore_args(ignore_args: List[str]) -> List[str]:
@@ -158,16 +229,25 @@ def main():
     start_time = datetime.now()
 
     args = parse_arguments()
-    # Set verbosity flags on the shared tools module
-    _tools.QUIET = bool(args.quiet)
-    _tools.VERBOSE = bool(args.verbose)
+    _tools.configure_verbosity(args.quiet, args.verbose)
 
     # Resolve project types
     selected_exts = select_project_types(args.project_type)
     years = get_year_window(args.years)
     ignore_patterns = flatten_ignore_args(args.ignore)
 
-    analyzer = ProjectModificationAnalyzer(args.root_directory, years, selected_exts, ignore_patterns)
+    analyzer = ProjectModificationAnalyzer(
+        args.root_directory,
+        years,
+        selected_exts,
+        ignore_patterns,
+        jobs=args.jobs,
+        per_directory=args.per_directory,
+        full_history=args.full_history,
+        write_commit_graph=args.write_commit_graph,
+        use_cache=args.use_cache,
+        include_merges=args.include_merges,
+    )
     analyzer.analyze(args.output_dir, write_while_analyze=args.write_while_analyze)
 
     elapsed = (datetime.now() - start_time).total_seconds()
@@ -1,116 +1,154 @@
 import os
 import subprocess
 import sys
-import csv
-from typing import Dict, List, Tuple
+from array import array
+from collections import Counter
+from itertools import accumulate
+from typing import FrozenSet, List, Optional, Tuple
 
-from tools import normalize_rel, nprint, vprint, subprocess_check
+from tools import GIT_COMMIT_GRAPH_CONFIG, GIT_LOG_OPTIONS, vprint, subprocess_check, subprocess_stream
 
 
 class Project:
     # Supported project types and accumulator configuration
     SUPPORTED_TYPES: Tuple[str, ...] = (".bproj", ".cbproj", ".csproj", ".dtproj", ".fsproj", ".groupproj", ".iscopeproj", ".jsproj", ".nugetproj", ".pbxproj", ".proj", ".pyproj", ".rptproj", ".scopeproj", ".shfbproj", ".sln_bproj", ".smproj", ".sqlproj", ".vbproj", ".vcproj", ".vcxproj", ".vdproj", ".vjsproj", ".xproj", ".sln")
+    # The same as a set, built once for membership and "all types selected" checks
+    SUPPORTED_TYPES_SET: FrozenSet[str] = frozenset(SUPPORTED_TYPES)
     ACC_MAX_YEARS: int = 5
-
-    def __init__(self, root: str, proj_dir: str, projectfiles: List[str], years: List[str]):
-        self.root: str = normalize_rel(root)
-        self.dir: str = normalize_rel(proj_dir)
-        self.rel_dir: str = normalize_rel(os.path.relpath(proj_dir, root))
+    # Accumulator column names, built once: ACC_KEYS[k - 1] is "Acc_k"
+    ACC_KEYS: Tuple[str, ...] = tuple(sys.intern(f"Acc_{i}") for i in range(1, ACC_MAX_YEARS + 1))
+
+    def __init__(
+        self,
+        root: str,
+        proj_dir: str,
+        rel_dir: str,
+        projectfiles: List[str],
+        years: List[str],
+        full_history: bool = False,
+        include_merges: bool = False,
+        nested_repo: bool = False,
+    ):
+        # Paths as produced by the directory walk (native separators); only passed to `git -C` and shown in warnings,
+        # so they are not normalized per project
+        self.root: str = root
+        self.dir: str = proj_dir
+        # Relative to root, "/"-separated, "." for the root itself; tracked by the directory walk
+        # Interned: it is the key shared with the history index, cache and ignore reporting
+        self.rel_dir: str = sys.intern(rel_dir)
         vprint(f"  {self.rel_dir}")
 
+        # Sorted once here, in place, so rows come out in a stable order whatever order the directory listing had
+        projectfiles.sort()
         self.projectfiles: List[str] = projectfiles
+        # Per-directory git log is bounded to the year window unless the full history is requested
+        self.full_history: bool = full_history
+        # Merge commits are skipped (--no-merges) unless requested; applies to both the log and the Total count
+        self.merges: List[str] = [] if include_merges else ["--no-merges"]
+        # Inside a submodule or nested clone below root, whose commits the repo-wide walk never sees
+        self.nested_repo: bool = nested_repo
+        # Window bounds as integers, so commit years are range-checked before any counting
+        self.newest_year: int = int(years[0])
+        self.oldest_year: int = int(years[-1])
+        self.since: str = f"{self.oldest_year}-01-01"
 
         self.total_modifications: int = 0
-        self.modification_dates: List[str] = []
-        self.year_counts: Dict[str, int] = {year: 0 for year in years}
+        # Commit counts indexed by year offset (0 = newest year), positioned like `years`
+        self.years: List[str] = years
+        self.year_counts: array = array("i", [0]) * len(years)
 
         self.acc_len: int = min(Project.ACC_MAX_YEARS, len(years))
-        self.accumulators: Dict[str, int] = {f"Acc_{i}": 0 for i in range(1, self.acc_len + 1)}
-
-    def __lt__(self, other):
-        for i in range(self.acc_len, 0, -1):
-            acc_self = self.accumulators.get(f"Acc_{i}", 0)
-            acc_other = other.accumulators.get(f"Acc_{i}", 0)
-            if acc_self != acc_other:
-                return acc_self > acc_other
-        return self.rel_dir < other.rel_dir
+        # accumulators[k - 1] is Acc_k, the commits of the newest k years
+        self.accumulators: array = array("i", [0]) * self.acc_len
 
-    def _get_git_modification_dates(self) -> List[str]:
+    def _get_git_modification_years(self) -> Tuple[Counter, int]:
         """
-        Generate a list of dates for commits that modified files under the given directory only.
-        Uses: git -C <directory> log --pretty=format:%ad --date=short -- .
-        On failure, prints a warning and returns an empty list.
+        Count commits that modified files under the given directory only.
+        Returns (commits per year within the window keyed by int year, number of commits listed).
+        Uses: git -C <directory> log --no-renames [--no-merges] --no-decorate --no-color [--since=<first year>-01-01] --pretty=tformat:%ad --date=format:%Y -- .
+        On failure, prints a warning and returns whatever was counted.
         """
+        since = [] if self.full_history else [f"--since={self.since}"]
+        oldest, newest = self.oldest_year, self.newest_year
+        year_counts: Counter = Counter()
+        listed = 0
+        # Every line is b"YYYY\n" (tformat terminates the last one too); only the few distinct keys are parsed
+        line_counts: Counter = Counter()
         try:
-            result = subprocess_check(["git", "-C", self.dir, "log", "--pretty=format:%ad", "--date=short", "--", "."])
-            if result.returncode != 0:
-                print(f"Warning: git log failed for '{self.dir}': {result.stderr.strip()}", file=sys.stderr)
-
-            modification_dates = [date for date in result.stdout.splitlines() if date]
-            self.total_modifications = len(modification_dates)
-
-            return modification_dates
-
+            line_counts.update(
+                subprocess_stream(
+                    [
+                        "git", "-C", self.dir, *GIT_COMMIT_GRAPH_CONFIG, "log", *GIT_LOG_OPTIONS, *self.merges, *since,
+                        "--pretty=tformat:%ad", "--date=format:%Y", "--", ".",
+                    ]
+                )
+            )
+        except subprocess.CalledProcessError as exc:
+            print(f"Warning: git log failed for '{self.dir}': {exc.stderr.decode('utf-8', errors='replace').strip()}", file=sys.stderr)
         except (subprocess.SubprocessError, OSError) as exc:
             print(f"Warning: git log exception for '{self.dir}': {exc}", file=sys.stderr)
-            return []
-
-    def _tally_year_counts(self, modification_dates: List[str]) -> None:
-        """Count commits per target year from a list of commit years."""
-        modification_years = [date.split("-")[0] for date in modification_dates]
-        for y in modification_years:
-            if y in self.year_counts:
-                self.year_counts[y] += 1
-
-    def _compute_accumulators(self) -> None:
-        """Compute cumulative sums for the most recent 1..max_k years based on the provided years order."""
-        vals = [self.year_counts[y] for y in self.year_counts]
-        running = 0
-        for k in range(1, self.acc_len + 1):
-            running += vals[k - 1]
-            self.accumulators[f"Acc_{k}"] = running
-
-    def _write_csv_rows(self, out_path: str, headers: List[str], data: List[dict]) -> None:
-        with open(out_path, "a", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=headers)
-            writer.writerows(data)
-
-    def analyze_directory(self) -> None:
-        """Analyze a single project directory and return the CSV row dict."""
-        modification_dates = self._get_git_modification_dates()
-        self._tally_year_counts(modification_dates)
-        self._compute_accumulators()
-        nprint(f"    -> commits(all-time): {self.total_modifications}; in-range: {sum(self.year_counts.values())}; in last {self.acc_len} years: {sum(self.accumulators.values())}")
-
-    def generate_csv_data(self) -> Tuple[List[dict], List[str]]:
-        """Generate CSV row data for each project file in the directory."""
-        rows: List[dict] = []
-        for file in self.projectfiles:
-            row: dict = {
-                "Project": normalize_rel(os.path.join(self.rel_dir, file)),
-                "Extension": os.path.splitext(file)[1],
-                "Total": self.total_modifications,
-            }
-            row.update(self.year_counts)
-            row.update(self.accumulators)
-            rows.append(row)
-        return rows, list(rows[0].keys()) if rows else ([], [])
-
-    def write_csv(self, out_path: str, csv_headers: List[str]) -> Tuple[int, int]:
-        rows, headers = self.generate_csv_data()
-        if not rows:
-            print(f"No data available for directory at '{self.rel_dir}'.", file=sys.stderr)
-            return 0, 0
-        if headers != csv_headers:
-            print(f"Error: CSV headers mismatch for directory at '{self.rel_dir}'.", file=sys.stderr)
-            print(f"Global CSV headers: {csv_headers}", file=sys.stderr)
-            print(f"Local CSV headers: {headers}", file=sys.stderr)
-            return 0, 0
 
         try:
-            self._write_csv_rows(out_path, headers, rows)
-        except (OSError, csv.Error, UnicodeError) as e:
-            print(f"Error: {e}", file=sys.stderr)
-            return 0, 0
+            for line, count in line_counts.items():
+                listed += count
+                year = int(line)
+                if oldest <= year <= newest:
+                    year_counts[year] = count
+        except ValueError as exc:
+            print(f"Warning: unexpected git log output for '{self.dir}': {exc}", file=sys.stderr)
+
+        return year_counts, listed
+
+    def _get_git_modification_total(self) -> int:
+        """
+        Count all-time commits that modified files under the directory without listing them.
+        Uses: git -C <directory> rev-list --count [--no-merges] HEAD -- .
+        On failure, prints a warning and returns 0.
+        """
+        try:
+            result = subprocess_check(["git", "-C", self.dir, *GIT_COMMIT_GRAPH_CONFIG, "rev-list", "--count", *self.merges, "HEAD", "--", "."])
+            return int(result.stdout.strip() or 0)
+
+        except (subprocess.SubprocessError, OSError, ValueError) as exc:
+            print(f"Warning: git rev-list exception for '{self.dir}': {exc}", file=sys.stderr)
+            return 0
+
+    def _tally_year_counts(self, modification_years: Counter) -> None:
+        """
+        Copy the commit counts of the target years out of a counter keyed by int year, then fill the
+        accumulators: cumulative sums for the most recent 1..acc_len years (years are newest first).
+        """
+        newest = self.newest_year
+        self.year_counts = array("i", [modification_years.get(newest - i, 0) for i in range(len(self.year_counts))])
+        self.accumulators = array("i", accumulate(self.year_counts[: self.acc_len]))
 
-        return len(rows), len(headers)
+    def analyze_directory(self, modification_years: Optional[Counter] = None) -> None:
+        """
+        Analyze a single project directory: fill total_modifications, year_counts and accumulators.
+        If `modification_years` (all-time commit counts keyed by int year) is given, no git call is made.
+        """
+        if modification_years is None:
+            modification_years, listed = self._get_git_modification_years()
+            if not self.full_history:
+                # The log above only covers the year window; count the all-time total separately
+                self.total_modifications = self._get_git_modification_total()
+            else:
+                self.total_modifications = listed
+        else:
+            self.total_modifications = sum(modification_years.values())
+        self._tally_year_counts(modification_years)
+
+    def summary(self) -> str:
+        """Return the one-line commit summary printed after the directory is analyzed."""
+        return f"    -> commits(all-time): {self.total_modifications}; in-range: {sum(self.year_counts)}; in last {self.acc_len} years: {sum(self.accumulators)}"
+
+    def csv_headers(self) -> List[str]:
+        """Return the CSV columns this project's rows are laid out in."""
+        return ["Project", "Extension", "Total", *self.years, *Project.ACC_KEYS[: self.acc_len]]
+
+    def generate_csv_data(self) -> Tuple[List[tuple], List[str]]:
+        """Generate one CSV row tuple per project file in the directory, positioned like csv_headers()."""
+        counts = (self.total_modifications, *self.year_counts, *self.accumulators)
+        rel_prefix = "" if self.rel_dir == "." else self.rel_dir + "/"
+        rows: List[tuple] = [(rel_prefix + file, os.path.splitext(file)[1], *counts) for file in self.projectfiles]
+        return rows, self.csv_headers()
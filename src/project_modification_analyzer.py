@@ -3,30 +3,76 @@ import os
 import re
 import subprocess
 import sys
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Set, Tuple
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
 
+from git_history_index import GitHistoryIndex
+from history_cache import HistoryCache
 from project import Project
+import tools as _tools
 from tools import normalize_rel, nprint, subprocess_check, vprint
 
 
 class ProjectModificationAnalyzer:
-    def __init__(self, root: str, years: List[str], selected_exts: Tuple[str, ...], ignore_patterns: List[str]) -> None:
+    # Directory names (compared lower-cased) never descended into: git metadata and tool caches that never hold
+    # source projects. Folders such as bin/, obj/ or packages/ can, so they are only pruned via --ignore
+    DEFAULT_SKIP_DIRS = frozenset({".git", ".vs", "node_modules"})
+    # Write buffer for the CSV data rows (the io default of 8 KiB means a syscall every few dozen rows)
+    CSV_BUFFER_SIZE: int = 1 << 20
+    # With --write-while-analyze, the CSV is flushed after every this many projects
+    CSV_FLUSH_PROJECTS: int = 64
+    # Glob markers of ignore patterns and their regex translation, applied in one left-to-right pass so the
+    # ".*" emitted for "**" is never rewritten again by the "*" rule
+    _GLOB_TOKEN_RE = re.compile(r"\*\*|\*|\.")
+    _GLOB_TOKEN_REGEX: Dict[str, str] = {".": r"\.", "**": ".*", "*": "[^/]*"}
+    # A full object name as stored in refs (SHA-1 or SHA-256)
+    _SHA_RE = re.compile(r"[0-9a-f]{40}(?:[0-9a-f]{24})?")
+
+    def __init__(
+        self,
+        root: str,
+        years: List[str],
+        selected_exts: Tuple[str, ...],
+        ignore_patterns: List[str],
+        jobs: int = 1,
+        per_directory: bool = False,
+        full_history: bool = False,
+        write_commit_graph: bool = True,
+        use_cache: bool = True,
+        include_merges: bool = False,
+    ) -> None:
         self.root: str = root
         self.years: List[str] = years
         self.csv_headers: List[str] = self._build_headers(years, Project.ACC_MAX_YEARS)
         self.selected_exts: Set[str] = set(selected_exts)
+        # Lower-cased once; the directory scan tests each file name with a single str.endswith over the tuple
+        self._ext_suffixes: Tuple[str, ...] = tuple(sorted({e.lower() for e in selected_exts}))
         self.ignore_patterns: List[str] = ignore_patterns
         self._ignore_regex: List[re.Pattern] = self._compile_ignore_patterns(ignore_patterns)
+        self._is_ignored: Callable[[str], bool] = self._build_ignore_matcher(self._ignore_regex)
         nprint("Precompiling ignore patterns...")
         for pattern, cregex in zip(self.ignore_patterns, self._ignore_regex):
             nprint(f"  {pattern} -> {cregex.pattern}")
         self.projects: List[Project] = []
-        self.filtered: List[Project] = []
-        self.ignored: List[Project] = []
+        self.ignored: List[str] = []
+        self.jobs: int = max(1, jobs)
+        self.per_directory: bool = per_directory
+        self.full_history: bool = full_history
+        self.write_commit_graph: bool = write_commit_graph
+        self.use_cache: bool = use_cache
+        self.include_merges: bool = include_merges
+        # Options of the repo-wide walk as run (also recorded in the history cache)
+        self.history_log_options: List[str] = GitHistoryIndex.log_options(include_merges)
+        # (sha, symbolic ref) of HEAD once resolved, see _resolve_head
+        self._head: Optional[Tuple[str, str]] = None
+        self._progress_lock = threading.Lock()
+        self._analyzed: int = 0
 
     def _build_headers(self, years: List[str], acc_max: int = Project.ACC_MAX_YEARS) -> List[str]:
-        return ["Project", "Extension", "Total"] + years + [f"Acc_{i}" for i in range(1, acc_max + 1)]
+        return ["Project", "Extension", "Total"] + years + list(Project.ACC_KEYS[:acc_max])
 
     def _hello(self) -> None:
         nprint("\nStarting analysis")
@@ -34,23 +80,84 @@ class ProjectModificationAnalyzer:
         nprint(f"    Time Range: past [{len(self.years)}] years")
         nprint(f"    Project Types: {', '.join(self.selected_exts)}")
         nprint(f"    Ignore Patterns: {', '.join(self.ignore_patterns) if self.ignore_patterns else '(none)'}")
+        nprint(f"    History: {f'per-directory git log, {self.jobs} job(s)' if self.per_directory else 'single repo-wide git log'}")
         nprint("\nSearching for project files...")
 
-    def _find_projectfiles(self, filenames: List[str]) -> List[str]:
-        projectfiles = []
-        for filename in filenames:
-            _, ext = os.path.splitext(filename)
-            ext = ext.lower()
-            if ext in self.selected_exts:
-                projectfiles.append(filename)
-        return sorted(projectfiles)
+    def _scan_directory(self, dirpath: str, rel_dir: str) -> Tuple[List[str], List[Tuple[str, str]], List[str], bool]:
+        """
+        List one directory (`rel_dir` relative to root, "/"-separated, "." for root), pruning DEFAULT_SKIP_DIRS and ignored ones.
+        Returns (project files, (path, rel_dir) of subdirectories to descend into, pruned rel_dirs, whether it has a .git entry).
+        """
+        ext_suffixes = self._ext_suffixes
+        # Relative paths are extended one segment at a time instead of calling os.path.relpath per directory
+        rel_prefix = "" if rel_dir == "." else rel_dir + "/"
+        projectfiles: List[str] = []
+        subdirs: List[Tuple[str, str]] = []
+        pruned: List[str] = []
+        has_git = False
+        try:
+            with os.scandir(dirpath) as entries:
+                for entry in entries:
+                    if entry.name == ".git":
+                        # A directory in a clone, a file in a submodule or worktree
+                        has_git = True
+                    elif not entry.is_dir(follow_symlinks=False):
+                        # A name that is just the suffix (".csproj") has no extension of its own, as with splitext
+                        name = entry.name
+                        lower = name.lower()
+                        if lower.endswith(ext_suffixes) and lower not in ext_suffixes:
+                            projectfiles.append(name)
+                    elif entry.name.lower() not in self.DEFAULT_SKIP_DIRS:
+                        sub_rel_dir = rel_prefix + entry.name
+                        if self._is_ignored(sub_rel_dir):
+                            pruned.append(sub_rel_dir)
+                        else:
+                            subdirs.append((entry.path, sub_rel_dir))
+        except OSError as exc:
+            print(f"Warning: cannot list directory '{dirpath}': {exc}", file=sys.stderr)
+
+        return projectfiles, subdirs, pruned, has_git
+
+    def _walk_subtree(self, top: Tuple[str, str]) -> Tuple[List[Project], List[str]]:
+        """
+        Depth-first walk of `top` = (path, rel_dir), inclusive. Returns the projects found and the pruned directories.
+        Projects at or below a directory with its own .git (a submodule or nested clone) are marked nested_repo.
+        """
+        projects: List[Project] = []
+        pruned: List[str] = []
+        stack = [(*top, False)]
+        while stack:
+            dirpath, rel_dir, nested_repo = stack.pop()
+            projectfiles, subdirs, ignored, has_git = self._scan_directory(dirpath, rel_dir)
+            nested_repo = nested_repo or has_git
+            pruned.extend(ignored)
+            if projectfiles:
+                projects.append(
+                    Project(
+                        self.root, dirpath, rel_dir, projectfiles, self.years, self.full_history, self.include_merges,
+                        nested_repo,
+                    )
+                )
+            # Reversed so that subdirectories are visited in listing order, like os.walk(topdown=True)
+            stack.extend((path, sub_rel_dir, nested_repo) for path, sub_rel_dir in reversed(subdirs))
+        return projects, pruned
 
     def _find_projects(self) -> List[Project]:
-        projects = []
-        for dirpath, _, filenames in os.walk(self.root):
-            projectfiles = self._find_projectfiles(filenames)
-            if projectfiles:
-                projects.append(Project(self.root, dirpath, projectfiles, self.years))
+        """
+        Create a Project for every directory under root containing selected project files.
+        Top-level subtrees are walked on a thread pool of `self.jobs` workers and merged in listing order.
+        """
+        projectfiles, subdirs, self.ignored, _ = self._scan_directory(self.root, ".")
+        projects: List[Project] = []
+        if projectfiles:
+            projects.append(
+                Project(self.root, self.root, ".", projectfiles, self.years, self.full_history, self.include_merges)
+            )
+
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            for sub_projects, pruned in executor.map(self._walk_subtree, subdirs):
+                projects.extend(sub_projects)
+                self.ignored.extend(pruned)
         return projects
 
     @staticmethod
@@ -61,34 +168,44 @@ class ProjectModificationAnalyzer:
         compiled: List[re.Pattern] = []
         for pattern in ignore_patterns:
             p = normalize_rel(pattern) + ("/" if pattern.endswith("/") or pattern.endswith("\\") else "")
-            p = p.replace(".", "\\.").replace("**", ".*").replace("*", "[^/]*")
+            p = ProjectModificationAnalyzer._GLOB_TOKEN_RE.sub(
+                lambda m: ProjectModificationAnalyzer._GLOB_TOKEN_REGEX[m.group()], p
+            )
             compiled.append(re.compile(p))
         return compiled
 
-    def _is_ignored(self, project: Project) -> bool:
-        if not self.ignore_patterns:
-            return False
-
-        rel_dir = project.rel_dir
-        if any(cregex.search(rel_dir) for cregex in self._ignore_regex):
-            return True
-
-        return False
-
-    def _filter_projects(self) -> Tuple[List[Project], List[Project]]:
-        filtered: List[Project] = []
-        ignored: List[Project] = []
-        for proj in self.projects:
-            if self._is_ignored(proj):
-                ignored.append(proj)
-            else:
-                filtered.append(proj)
-
-        if ignored:
-            nprint(f"    Ignored {len(ignored)} directories via patterns: {', '.join(self.ignore_patterns)}")
-            vprint("  -> " + "\n  -> ".join(sorted(normalize_rel(p.rel_dir) for p in ignored)))
-
-        return filtered, ignored
+    @staticmethod
+    def _build_ignore_matcher(ignore_regex: List[re.Pattern]) -> Callable[[str], bool]:
+        """
+        Fold the compiled ignore patterns into a single alternation and return a predicate over
+        normalized relative directory paths, so each directory costs one regex search regardless of pattern count.
+        """
+        if not ignore_regex:
+            return lambda rel_dir: False
+
+        search = re.compile("|".join(f"(?:{cregex.pattern})" for cregex in ignore_regex)).search
+        return lambda rel_dir: search(rel_dir) is not None
+
+    def _report_ignored(self) -> None:
+        if self.ignored:
+            nprint(f"    Pruned {len(self.ignored)} directories via patterns: {', '.join(self.ignore_patterns)}")
+            # Sorting and joining the full list is only worth it when it is shown
+            if _tools.VERBOSE:
+                vprint("  -> " + "\n  -> ".join(sorted(self.ignored)))
+
+    def _write_commit_graph(self) -> None:
+        """
+        Write (or refresh) the repo's commit-graph with changed-path Bloom filters.
+        Uses: git -C <root> commit-graph write --reachable --changed-paths
+        On failure (e.g. read-only repo or old git), prints a warning and continues without it.
+        """
+        nprint("Writing commit-graph with changed-path Bloom filters...")
+        try:
+            subprocess_check(["git", "-C", self.root, "commit-graph", "write", "--reachable", "--changed-paths"])
+        except subprocess.CalledProcessError as exc:
+            print(f"Warning: git commit-graph write failed at '{self.root}': {exc.stderr.strip()}", file=sys.stderr)
+        except (subprocess.SubprocessError, OSError) as exc:
+            print(f"Warning: git commit-graph exception at '{self.root}': {exc}", file=sys.stderr)
 
     def _sanitize_branch_name(self, name: str) -> str:
         # Replace path separators and spaces; allow alnum, dot, underscore, dash
@@ -96,36 +213,75 @@ class ProjectModificationAnalyzer:
         safe = re.sub(r"[^A-Za-z0-9._-]", "-", safe)
         return safe or "unknown"
 
+    def _read_head(self) -> Optional[Tuple[str, str]]:
+        """
+        Resolve HEAD from .git/HEAD and its loose or packed ref without starting git.
+        Returns (full sha, symbolic ref or "" if detached), or None for any other layout (e.g. unborn branch, reftable).
+        """
+        git_dir = os.path.join(self.root, ".git")
+        try:
+            with open(os.path.join(git_dir, "HEAD"), "r", encoding="utf-8") as f:
+                head = f.read().strip()
+            if not head.startswith("ref: "):
+                return (head, "") if self._SHA_RE.fullmatch(head) else None
+
+            ref = head[len("ref: "):]
+            try:
+                with open(os.path.join(git_dir, *ref.split("/")), "r", encoding="utf-8") as f:
+                    sha = f.read().strip()
+            except FileNotFoundError:
+                # Not a loose ref; look it up in packed-refs ("<sha> <ref>" lines)
+                sha = ""
+                with open(os.path.join(git_dir, "packed-refs"), "r", encoding="utf-8") as f:
+                    for line in f:
+                        packed_sha, _, name = line.rstrip("\n").partition(" ")
+                        if name == ref:
+                            sha = packed_sha
+                            break
+            return (sha, ref) if self._SHA_RE.fullmatch(sha) else None
+
+        except (OSError, UnicodeDecodeError):
+            return None
+
+    def _resolve_head(self) -> Tuple[str, str]:
+        """
+        Return (full sha, symbolic ref or "" if detached) of HEAD, resolved once per run.
+        Uses: git -C <root> rev-parse HEAD --symbolic-full-name HEAD  (only if _read_head cannot resolve it)
+        On failure (e.g. no commits yet), prints a warning and returns ("", "").
+        """
+        if self._head is not None:
+            return self._head
+
+        head = self._read_head()
+        if head is None:
+            head = ("", "")
+            try:
+                # The full HEAD sha, then HEAD's symbolic ref ("refs/heads/<branch>", or "HEAD" if detached)
+                result = subprocess_check(["git", "-C", self.root, "rev-parse", "HEAD", "--symbolic-full-name", "HEAD"])
+                lines = result.stdout.splitlines()
+                if len(lines) == 2:
+                    sha, ref = lines[0].strip(), lines[1].strip()
+                    head = (sha, "" if ref.upper() == "HEAD" else ref)
+                else:
+                    print(f"Warning: unexpected git rev-parse output at '{self.root}': {result.stdout.strip()}", file=sys.stderr)
+
+            except (OSError, subprocess.SubprocessError, UnicodeDecodeError) as exc:
+                print(f"Warning: git query exception at '{self.root}': {exc}", file=sys.stderr)
+        self._head = head
+        return head
+
     def _get_repo_branch_and_head(self) -> Tuple[str, str]:
         """Return (branch, short_sha6) for the repo at root_dir. On failure, ('unknown','unknown')."""
-        try:
-            # Prefer branch --show-current; fallback to rev-parse
-            r1 = subprocess_check(["git", "-C", self.root, "branch", "--show-current"])
-            branch = r1.stdout.strip()
-            if not branch:
-                r2 = subprocess_check(["git", "-C", self.root, "rev-parse", "--abbrev-ref", "HEAD"])
-                if r2.returncode == 0:
-                    branch = r2.stdout.strip()
-            if branch.upper() == "HEAD" or not branch:
-                branch = "detached"
-
-            r3 = subprocess_check(["git", "-C", self.root, "rev-parse", "--short=6", "HEAD"])
-            if r3.returncode != 0:
-                print(f"Warning: git rev-parse failed at '{self.root}': {r3.stderr.strip()}", file=sys.stderr)
-                return ("unknown", "unknown")
-            sha = r3.stdout.strip()
-            return (self._sanitize_branch_name(branch), sha)
-
-        except (OSError, subprocess.SubprocessError, UnicodeDecodeError) as exc:
-            print(f"Warning: git query exception at '{self.root}': {exc}", file=sys.stderr)
+        sha, ref = self._resolve_head()
+        if not sha:
             return ("unknown", "unknown")
+        branch = ref[len("refs/heads/"):] if ref.startswith("refs/heads/") else ""
+        return (self._sanitize_branch_name(branch or "detached"), sha[:6])
 
     def _build_filename_suffix(self) -> str:
-        sel_norm = sorted(self.selected_exts or ())
-        all_norm = sorted(Project.SUPPORTED_TYPES)
-        if sel_norm and sel_norm != all_norm:
-            tokens = [e.lstrip(".") for e in sel_norm]
-            return "_" + "_".join(tokens)
+        # Set equality needs no sorting; the selection is only sorted when it names the file
+        if self.selected_exts and self.selected_exts != Project.SUPPORTED_TYPES_SET:
+            return "_" + "_".join(e.lstrip(".") for e in sorted(self.selected_exts))
         return ""
 
     def _determine_output_path(self, output_dir: str) -> str:
@@ -139,8 +295,7 @@ class ProjectModificationAnalyzer:
 
     def _write_csv_headers(self, out_path: str, headers: List[str]) -> None:
         with open(out_path, "w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=headers)
-            writer.writeheader()
+            csv.writer(f).writerow(headers)
 
     def _add_timestamp(self, filename: str) -> str:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -169,12 +324,101 @@ class ProjectModificationAnalyzer:
         print(f"    rows: {row}")
         print(f"    columns: {col}")
 
-    def _aggregate_modifications(self) -> List[dict]:
-        data: List[dict] = []
-        total_dirs = len(self.filtered)
-        for idx, project in enumerate(self.filtered, start=1):
-            nprint(f"[{idx}/{total_dirs}] Analyzing: {project.rel_dir}")
-            project.analyze_directory()
+    def _walk_history(self, proj_dirs: Set[str], revisions: List[str]) -> Optional[Dict[str, Counter]]:
+        """
+        Count commits per year for the given project directories with one GitHistoryIndex walk (commit-graph written first).
+        On failure, prints a warning and returns None.
+        """
+        if self.write_commit_graph:
+            self._write_commit_graph()
+        index = GitHistoryIndex(self.root, proj_dirs, self.include_merges)
+        return index.year_counts if index.walk(revisions) else None
+
+    def _get_head_sha(self) -> str:
+        """Return the full sha of HEAD, or "" if it cannot be resolved (e.g. no commits yet)."""
+        return self._resolve_head()[0]
+
+    def _is_ancestor(self, commit: str, head: str) -> bool:
+        """Return True if `commit` is reachable from `head` (git merge-base --is-ancestor)."""
+        try:
+            subprocess_check(["git", "-C", self.root, "merge-base", "--is-ancestor", commit, head])
+            return True
+        except (subprocess.SubprocessError, OSError):
+            return False
+
+    def _get_all_modifications(self) -> Dict[str, Counter]:
+        """
+        Return all-time commit counts per year for every project directory outside nested repos, via the HistoryCache:
+        a current cache needs no walk, an ancestor of HEAD only `<cached head>..HEAD`, anything else the full walk.
+        On failure, prints a warning and returns an empty mapping.
+        """
+        # Submodules and nested clones have their own history, which the walk of root does not list
+        proj_dirs: Set[str] = {p.rel_dir for p in self.projects if not p.nested_repo}
+        if not proj_dirs:
+            return {}
+        head = self._get_head_sha()
+        if not self.use_cache or not head:
+            return self._walk_history(proj_dirs, [head or "HEAD"]) or {}
+
+        cache = HistoryCache(self.root, self.history_log_options)
+        if cache.load() and proj_dirs <= cache.year_counts.keys():
+            if cache.head == head:
+                nprint(f"History cache is up to date at {head[:6]}: {cache.path}")
+                return cache.year_counts
+            if self._is_ancestor(cache.head, head):
+                delta = self._walk_history(set(cache.year_counts), [f"{cache.head}..{head}"])
+                if delta is not None:
+                    for rel_dir, counts in delta.items():
+                        cache.year_counts[rel_dir].update(counts)
+                    nprint(f"History cache updated from {cache.head[:6]} to {head[:6]}: {cache.path}")
+                    cache.save(head, cache.year_counts)
+                    return cache.year_counts
+
+        # Directories already in the cache are walked too, so they stay valid at the new head
+        year_counts = self._walk_history(proj_dirs | set(cache.year_counts), [head])
+        if year_counts is None:
+            return {}
+        cache.save(head, year_counts)
+        nprint(f"History cache written at {head[:6]}: {cache.path}")
+        return year_counts
+
+    def _analyze_project(self, project: Project, modification_years: Optional[Counter] = None) -> Project:
+        project.analyze_directory(modification_years)
+        with self._progress_lock:
+            self._analyzed += 1
+            # The progress lines (and the summary's sums) are only built when they will be printed
+            if not _tools.QUIET:
+                nprint(f"[{self._analyzed}/{len(self.projects)}] Analyzed: {project.rel_dir}")
+                nprint(project.summary())
+        return project
+
+    def _analyze_projects(self) -> Iterator[Project]:
+        """
+        Analyze the projects and yield them in discovery order.
+        By default histories come from one repo-wide git log; with `per_directory`, each project runs its own on a thread pool.
+        """
+        self._analyzed = 0
+        if not self.per_directory:
+            all_years = self._get_all_modifications()
+            for project in self.projects:
+                # Projects in a submodule or nested clone run their own scoped git log, as with per_directory
+                modification_years = None if project.nested_repo else all_years.get(project.rel_dir, Counter())
+                yield self._analyze_project(project, modification_years)
+            return
+
+        if self.write_commit_graph:
+            self._write_commit_graph()
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            yield from executor.map(self._analyze_project, self.projects)
+
+    def _iter_rows(self) -> Iterator[tuple]:
+        """Analyze the projects and yield their CSV rows one at a time, in discovery order."""
+        for rows in self._iter_project_rows():
+            yield from rows
+
+    def _iter_project_rows(self) -> Iterator[List[tuple]]:
+        """Analyze the projects and yield the CSV rows of each one as a batch, in discovery order."""
+        for project in self._analyze_projects():
             rows, headers = project.generate_csv_data()
             if not rows:
                 print(f"No data available for directory at '{project.rel_dir}'.", file=sys.stderr)
@@ -183,8 +427,10 @@ class ProjectModificationAnalyzer:
                 print(f"Global CSV headers: {self.csv_headers}", file=sys.stderr)
                 print(f"Local CSV headers: {headers}", file=sys.stderr)
                 continue
-            data.extend(rows)
-        return data
+            yield rows
+
+    def _aggregate_modifications(self) -> List[tuple]:
+        return list(self._iter_rows())
 
     def _analyze_then_write(self, output_dir: str) -> bool:
         nprint("Aggregating modifications before writing CSV...")
@@ -201,9 +447,8 @@ class ProjectModificationAnalyzer:
         nprint(f"Output CSV will be written to: {out_path}\n")
 
         try:
-            with open(out_path, "a", newline="", encoding="utf-8") as f:
-                writer = csv.DictWriter(f, fieldnames=self.csv_headers)
-                writer.writerows(data)
+            with open(out_path, "a", newline="", encoding="utf-8", buffering=self.CSV_BUFFER_SIZE) as f:
+                csv.writer(f).writerows(data)
         except (OSError, csv.Error, UnicodeError) as e:
             print(f"Error: {e}", file=sys.stderr)
             return False
@@ -220,19 +465,22 @@ class ProjectModificationAnalyzer:
 
         nprint(f"Output CSV will be written to: {out_path}\n")
 
-        output_rows, output_cols = 0, 0
-        for idx, project in enumerate(self.filtered, start=1):
-            nprint(f"[{idx}/{len(self.filtered)}] Analyzing: {project.rel_dir}")
-            project.analyze_directory()
-            rows, cols = project.write_csv(out_path, self.csv_headers)
-            output_rows += rows
-            if output_cols == 0:
-                output_cols = cols
-            else:
-                if cols != output_cols:
-                    print(f"Warning: Inconsistent column count for project '{project.rel_dir}': {cols} vs {output_cols}", file=sys.stderr)
+        # Rows are written one project at a time through one open writer
+        output_rows = 0
+        try:
+            with open(out_path, "a", newline="", encoding="utf-8", buffering=self.CSV_BUFFER_SIZE) as f:
+                writer = csv.writer(f)
+                for written, rows in enumerate(self._iter_project_rows(), 1):
+                    writer.writerows(rows)
+                    output_rows += len(rows)
+                    # Finished projects reach the file periodically instead of only when the buffer fills
+                    if written % self.CSV_FLUSH_PROJECTS == 0:
+                        f.flush()
+        except (OSError, csv.Error, UnicodeError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return False
 
-        self._print_csv_stats(out_path, output_rows, output_cols)
+        self._print_csv_stats(out_path, output_rows, len(self.csv_headers))
 
         return True
 
@@ -240,14 +488,12 @@ class ProjectModificationAnalyzer:
         self._hello()
 
         self.projects = self._find_projects()
-        nprint(f"Found {len(self.projects)} project directories before filtering")
-
-        self.filtered, self.ignored = self._filter_projects()
-        if not self.filtered:
+        self._report_ignored()
+        if not self.projects:
             print(f"No project directories ({'/'.join(Project.SUPPORTED_TYPES)}) found. Exiting...")
             return
 
-        nprint(f"Using {len(self.filtered)} project directories after filtering\n")
+        nprint(f"Found {len(self.projects)} project directories\n")
 
         # Choose one of the two strategies below:
         # 1) Analyze all projects first, then write CSV at once
@@ -1,30 +1,108 @@
 import os
+import shutil
 import subprocess
-from typing import List
+import tempfile
+import threading
+from typing import Dict, Iterator, List, Optional
 
 # Global verbosity flag; set in main(); default to verbose output
 QUIET = False
 VERBOSE = False
 
+# Serializes console output so lines from worker threads never interleave
+PRINT_LOCK = threading.RLock()
+
+# Config passed to history-walking git commands so they use the commit-graph file and its
+# changed-path Bloom filters even when disabled in the user's config
+GIT_COMMIT_GRAPH_CONFIG: List[str] = ["-c", "core.commitGraph=true", "-c", "commitGraph.readChangedPaths=true"]
+
+# git log options shared by every history walk: only commit dates and paths are read, so rename
+# detection, ref decoration and colouring are pure overhead (and would follow the user's config otherwise)
+GIT_LOG_OPTIONS: List[str] = ["--no-renames", "--no-decorate", "--no-color"]
+
+# Environment for every git child process, built once: all calls are read-only apart from the commit-graph
+# write, so optional locks (e.g. the index refresh of `git status`) are skipped, and the C locale keeps
+# git's output independent of the user's language settings
+GIT_ENV: Dict[str, str] = {**os.environ, "GIT_OPTIONAL_LOCKS": "0", "LC_ALL": "C"}
+
+# git resolved to an absolute path once. With it and close_fds=False, CPython starts git via posix_spawn
+# instead of fork + exec + closing every inherited descriptor. This is safe because descriptors opened by
+# Python are non-inheritable (PEP 446). Windows keeps the defaults: its pipe handles are inheritable.
+GIT_EXECUTABLE: str = shutil.which("git") or "git"
+_GIT_SPAWN_OPTIONS: Dict[str, object] = (
+    {"executable": GIT_EXECUTABLE, "close_fds": False} if os.name == "posix" and os.path.isabs(GIT_EXECUTABLE) else {}
+)
+
+
+def configure_verbosity(quiet: bool, verbose: bool) -> None:
+    """Set the output level once at startup (before any worker thread prints)."""
+    global QUIET, VERBOSE
+    QUIET, VERBOSE = bool(quiet), bool(verbose)
+
 
 def nprint(*args, **kwargs):
     if not QUIET:
-        print(*args, **kwargs)
+        with PRINT_LOCK:
+            print(*args, **kwargs)
 
 
 def vprint(*args, **kwargs):
     if VERBOSE:
-        print(*args, **kwargs)
+        with PRINT_LOCK:
+            print(*args, **kwargs)
 
 
 def normalize_rel(path: str) -> str:
     return os.path.normpath(path).replace("\\", "/")
 
 
-def subprocess_check(cmd: List[str]) -> subprocess.CompletedProcess:
+def _set_spawn_defaults(cmd: List[str], kwargs: Dict) -> None:
+    """Fill in GIT_ENV and, for git commands, the posix_spawn-friendly options unless the caller set them."""
+    kwargs.setdefault("env", GIT_ENV)
+    if cmd and cmd[0] == "git":
+        for key, value in _GIT_SPAWN_OPTIONS.items():
+            kwargs.setdefault(key, value)
+
+
+def subprocess_check(cmd: List[str], **kwargs) -> subprocess.CompletedProcess:
     """
-    Run a subprocess command in the given working directory.
+    Run a subprocess command in the given working directory, with GIT_ENV as the environment unless `env` is given.
+    Extra keyword arguments (e.g. encoding) are forwarded to subprocess.run.
     Returns the CompletedProcess instance.
     Raises subprocess.CalledProcessError on failure.
     """
-    return subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, check=True)
+    _set_spawn_defaults(cmd, kwargs)
+    return subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, check=True, **kwargs)
+
+
+def _split_stream(stream, sep: bytes, size: int) -> Iterator[bytes]:
+    """Yield the `sep`-separated fields of a binary stream (without the separator), reading `size` bytes at a time."""
+    rest = b""
+    while True:
+        chunk = stream.read1(size)
+        if not chunk:
+            break
+        fields = (rest + chunk).split(sep)
+        rest = fields.pop()
+        yield from fields
+    if rest:
+        yield rest
+
+
+def subprocess_stream(cmd: List[str], bufsize: int = 1 << 16, sep: Optional[bytes] = None, **kwargs) -> Iterator:
+    """
+    Run a subprocess command and yield its stdout as it is produced, line by line (bytes unless e.g. encoding is given)
+    or split on `sep` (binary only), so memory stays constant however long the output is. Uses GIT_ENV unless `env`
+    is given; extra keyword arguments are forwarded to subprocess.Popen.
+    Raises subprocess.CalledProcessError (with the captured stderr, as bytes) after the last line if the command failed.
+    """
+    _set_spawn_defaults(cmd, kwargs)
+    # stderr goes to a temporary file rather than a pipe: a pipe nobody reads before stdout ends would block the
+    # child (and this reader) once git wrote more than the pipe buffer to it
+    with tempfile.TemporaryFile() as err:
+        with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=err, bufsize=bufsize, **kwargs) as proc:
+            yield from proc.stdout if sep is None else _split_stream(proc.stdout, sep, bufsize)
+        err.seek(0)
+        stderr = err.read()
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, cmd, stderr=stderr)